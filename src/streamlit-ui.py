@@ -1,10 +1,26 @@
+import csv
+import io
 import json
+import math
+import random
 import re
+import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any
 
 import boto3
 import streamlit as st
+from botocore.config import Config
+
+DEFAULT_RUNTIME_ARN = "arn:aws:bedrock-agentcore:us-east-1:214121351640:runtime/support_agent-HqGVgH3kUZ"
+DEFAULT_QUALIFIER = "support_triage_tools_ep"
+CLIENT_POOL_SIZE = 100  # matches the load console's max concurrency
+LOAD_RENDER_INTERVAL_S = 0.5
+LOAD_RESULT_FIELDS = ["index", "started_at", "latency_ms", "ok", "session_id", "customer_id", "message", "error"]
+
+_load_worker = threading.local()
 
 
 def default_session_id() -> str:
@@ -12,14 +28,30 @@ def default_session_id() -> str:
     return f"session-{uuid.uuid4()}-{uuid.uuid4().hex[:8]}"
 
 
+@st.cache_resource(show_spinner=False)
+def get_runtime_client(region_name: str) -> Any:
+    # boto3 clients are thread-safe; reuse one per region across reruns.
+    config = Config(max_pool_connections=CLIENT_POOL_SIZE)
+    return boto3.client("bedrock-agentcore", region_name=region_name, config=config)
+
+
+@st.cache_resource(show_spinner=False)
+def get_load_client(region_name: str) -> Any:
+    # No retries, so throttling and 5xx responses show up as errors instead of extra latency.
+    config = Config(max_pool_connections=CLIENT_POOL_SIZE, retries={"max_attempts": 1, "mode": "standard"})
+    return boto3.client("bedrock-agentcore", region_name=region_name, config=config)
+
+
 def invoke_agent_runtime(
     region_name: str,
     agent_runtime_arn: str,
     runtime_session_id: str,
     payload_dict: dict[str, Any],
     qualifier: str | None = None,
+    client: Any = None,
 ) -> dict[str, Any]:
-    client = boto3.client("bedrock-agentcore", region_name=region_name)
+    if client is None:
+        client = get_runtime_client(region_name)
     payload = json.dumps(payload_dict)
 
     params: dict[str, Any] = {
@@ -90,69 +122,331 @@ def extract_mcp_payload(context_json: Any) -> Any:
     return outer
 
 
+def parse_mix(text: str) -> list[str]:
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+def latency_percentiles(latencies_ms: list[float]) -> dict[str, float]:
+    # Nearest-rank percentiles; good enough for a quick capacity check.
+    if not latencies_ms:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+    ordered = sorted(latencies_ms)
+    last = len(ordered) - 1
+    return {
+        name: ordered[min(last, max(0, math.ceil(len(ordered) * pct / 100) - 1))]
+        for name, pct in (("p50", 50), ("p95", 95), ("p99", 99))
+    }
+
+
+def worker_session_id() -> str:
+    # One runtime session per worker thread: concurrent calls never share a session,
+    # but sequential calls on the same worker reuse a warm one.
+    if not hasattr(_load_worker, "session_id"):
+        _load_worker.session_id = default_session_id()
+    return _load_worker.session_id
+
+
+def timed_invocation(
+    index: int,
+    client: Any,
+    agent_runtime_arn: str,
+    qualifier: str | None,
+    message: str,
+    customer_id: str,
+    actor_id: str,
+    cold_start: bool = False,
+) -> dict[str, Any]:
+    session_id = default_session_id() if cold_start else worker_session_id()
+    payload = {
+        "message": message,
+        "customer_id": customer_id,
+        "session_id": session_id,
+        "actor_id": actor_id,
+    }
+    started_at = time.time()
+    start = time.perf_counter()
+    error = ""
+    try:
+        invoke_agent_runtime(
+            region_name=client.meta.region_name,
+            agent_runtime_arn=agent_runtime_arn,
+            runtime_session_id=session_id,
+            payload_dict=payload,
+            qualifier=qualifier,
+            client=client,
+        )
+    except Exception as exc:
+        error = str(exc)
+    return {
+        "index": index,
+        "started_at": started_at,
+        "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+        "ok": not error,
+        "session_id": session_id,
+        "customer_id": customer_id,
+        "message": message,
+        "error": error,
+    }
+
+
+def results_to_csv(results: list[dict[str, Any]]) -> str:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=LOAD_RESULT_FIELDS)
+    writer.writeheader()
+    writer.writerows(sorted(results, key=lambda row: row["index"]))
+    return buffer.getvalue()
+
+
+def new_chart_rows() -> dict[str, list[float]]:
+    return {"elapsed_s": [], "p50": [], "p95": [], "p99": [], "throughput": [], "error_rate": []}
+
+
+def append_chart_point(
+    chart_rows: dict[str, list[float]],
+    window: list[dict[str, Any]],
+    window_s: float,
+    elapsed_s: float,
+) -> None:
+    # Stats cover only the calls completed since the previous point, so late slowdowns show up.
+    percentiles = latency_percentiles([row["latency_ms"] for row in window])
+    errors = sum(1 for row in window if not row["ok"])
+    chart_rows["elapsed_s"].append(round(elapsed_s, 2))
+    for name, value in percentiles.items():
+        chart_rows[name].append(value)
+    chart_rows["throughput"].append(round(len(window) / window_s, 2) if window_s > 0 else 0.0)
+    chart_rows["error_rate"].append(round(errors / len(window) * 100, 1) if window else 0.0)
+
+
+def render_load_stats(
+    placeholder: Any,
+    results: list[dict[str, Any]],
+    total: int,
+    elapsed_s: float,
+    chart_rows: dict[str, list[float]],
+) -> None:
+    done = len(results)
+    throughput = chart_rows["throughput"][-1] if chart_rows["throughput"] else 0.0
+    error_rate = chart_rows["error_rate"][-1] if chart_rows["error_rate"] else 0.0
+    with placeholder.container():
+        st.progress(done / total if total else 1.0, text=f"{done}/{total} invocations")
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Completed", done)
+        col2.metric("Throughput (req/s, recent)", f"{throughput:.2f}")
+        col3.metric("Error rate (recent)", f"{error_rate:.1f}%")
+        col4.metric("Elapsed (s)", f"{elapsed_s:.1f}")
+        if chart_rows["elapsed_s"]:
+            st.line_chart(
+                chart_rows, x="elapsed_s", y=["p50", "p95", "p99"], x_label="Elapsed (s)", y_label="Latency (ms)"
+            )
+            st.line_chart(
+                chart_rows, x="elapsed_s", y="throughput", x_label="Elapsed (s)", y_label="Throughput (req/s)"
+            )
+
+
 st.set_page_config(page_title="Support Triage UI", layout="wide")
 st.title("Support Triage Agent Sandbox UI")
 
-with st.form("agent_form"):
-    col1, col2 = st.columns(2)
-    with col1:
-        region = st.text_input("AWS Region", value="us-east-1")
-        agent_runtime_arn = st.text_input(
-            "Agent Runtime ARN",
-            value="arn:aws:bedrock-agentcore:us-east-1:214121351640:runtime/support_agent-HqGVgH3kUZ",
-        )
-        qualifier = st.text_input("Qualifier (optional)", value="support_triage_tools_ep")
-    with col2:
-        runtime_session_id = st.text_input("Runtime Session ID (min 33 chars)", value=default_session_id())
-        customer_id = st.text_input("Customer ID", value="C1005")
-        actor_id = st.text_input("Actor ID", value="demo-user")
-
-    message = st.text_area("Message", value="My payment failed and I was charged twice.", height=100)
-    submitted = st.form_submit_button("Invoke Agent Runtime")
-
-if submitted:
-    if len(runtime_session_id) < 33:
-        st.error("Runtime Session ID must be at least 33 characters.")
-    else:
-        payload = {
-            "message": message,
-            "customer_id": customer_id,
-            "session_id": runtime_session_id,
-            "actor_id": actor_id,
-        }
-
-        try:
-            response_data = invoke_agent_runtime(
-                region_name=region,
-                agent_runtime_arn=agent_runtime_arn,
-                runtime_session_id=runtime_session_id,
-                payload_dict=payload,
-                qualifier=qualifier.strip() or None,
+single_tab, load_tab = st.tabs(["Single Invocation", "Load Console"])
+
+with single_tab:
+    with st.form("agent_form"):
+        col1, col2 = st.columns(2)
+        with col1:
+            region = st.text_input("AWS Region", value="us-east-1")
+            agent_runtime_arn = st.text_input(
+                "Agent Runtime ARN",
+                value=DEFAULT_RUNTIME_ARN,
             )
-        except Exception as exc:
-            st.error(f"Invocation failed: {exc}")
+            qualifier = st.text_input("Qualifier (optional)", value=DEFAULT_QUALIFIER)
+        with col2:
+            runtime_session_id = st.text_input("Runtime Session ID (min 33 chars)", value=default_session_id())
+            customer_id = st.text_input("Customer ID", value="C1005")
+            actor_id = st.text_input("Actor ID", value="demo-user")
+
+        message = st.text_area("Message", value="My payment failed and I was charged twice.", height=100)
+        submitted = st.form_submit_button("Invoke Agent Runtime")
+
+    if submitted:
+        if len(runtime_session_id) < 33:
+            st.error("Runtime Session ID must be at least 33 characters.")
         else:
-            st.success("Invocation succeeded")
-            result_text = response_data.get("result", "")
-            parsed = parse_result_block(result_text) if isinstance(result_text, str) else {}
-
-            metric1, metric2 = st.columns(2)
-            metric1.metric("Intent", parsed.get("intent") or "N/A")
-            metric2.metric("Severity", parsed.get("severity") or "N/A")
-
-            st.subheader("User Issue")
-            st.write(parsed.get("user_issue") or "N/A")
-
-            st.subheader("MCP Context")
-            context_json = parsed.get("context_json")
-            if context_json is not None:
-                st.json(context_json)
-                extracted = extract_mcp_payload(context_json)
-                if extracted is not None:
-                    st.subheader("Extracted Customer Context")
-                    st.json(extracted)
+            payload = {
+                "message": message,
+                "customer_id": customer_id,
+                "session_id": runtime_session_id,
+                "actor_id": actor_id,
+            }
+
+            try:
+                response_data = invoke_agent_runtime(
+                    region_name=region,
+                    agent_runtime_arn=agent_runtime_arn,
+                    runtime_session_id=runtime_session_id,
+                    payload_dict=payload,
+                    qualifier=qualifier.strip() or None,
+                )
+            except Exception as exc:
+                st.error(f"Invocation failed: {exc}")
             else:
-                st.write("No parseable MCP context found.")
+                st.success("Invocation succeeded")
+                result_text = response_data.get("result", "")
+                parsed = parse_result_block(result_text) if isinstance(result_text, str) else {}
+
+                metric1, metric2 = st.columns(2)
+                metric1.metric("Intent", parsed.get("intent") or "N/A")
+                metric2.metric("Severity", parsed.get("severity") or "N/A")
+
+                st.subheader("User Issue")
+                st.write(parsed.get("user_issue") or "N/A")
+
+                st.subheader("MCP Context")
+                context_json = parsed.get("context_json")
+                if context_json is not None:
+                    st.json(context_json)
+                    extracted = extract_mcp_payload(context_json)
+                    if extracted is not None:
+                        st.subheader("Extracted Customer Context")
+                        st.json(extracted)
+                else:
+                    st.write("No parseable MCP context found.")
+
+                with st.expander("Raw Agent Response"):
+                    st.json(response_data)
+
+with load_tab:
+    with st.form("load_form"):
+        col1, col2 = st.columns(2)
+        with col1:
+            load_region = st.text_input("AWS Region", value="us-east-1", key="load_region")
+            load_runtime_arn = st.text_input("Agent Runtime ARN", value=DEFAULT_RUNTIME_ARN, key="load_runtime_arn")
+            load_qualifier = st.text_input("Qualifier (optional)", value=DEFAULT_QUALIFIER, key="load_qualifier")
+            load_actor_id = st.text_input("Actor ID", value="load-test", key="load_actor_id")
+        with col2:
+            total_invocations = st.number_input("Total invocations", min_value=1, max_value=5000, value=50)
+            concurrency = st.number_input("Concurrency", min_value=1, max_value=CLIENT_POOL_SIZE, value=5)
+            cold_start = st.checkbox(
+                "Cold-start mode (new runtime session per call)",
+                value=False,
+                help="Measures session provisioning and uses up active-session quota; off by default.",
+            )
+
+        message_mix_text = st.text_area(
+            "Message mix (one per line, picked at random)",
+            value="My payment failed and I was charged twice.\nI cannot log in to my account.\nWhere is my refund?",
+            height=100,
+        )
+        customer_mix_text = st.text_area(
+            "Customer ID mix (one per line, picked at random)",
+            value="C1001\nC1003\nC1005",
+            height=100,
+        )
+        load_submitted = st.form_submit_button("Start Load Run")
+
+    st.caption("Interacting with any other widget on this page while a run is in progress aborts the run.")
+    stats_placeholder = st.empty()
+
+    # Calls already running when a run was aborted keep going; don't stack a new run on top of them.
+    in_flight = sum(1 for future in st.session_state.get("load_futures", []) if not future.done())
+    if in_flight:
+        st.warning(
+            f"An aborted run still has {in_flight} call(s) in flight. "
+            "Wait for them to finish before starting a new run."
+        )
+
+    if load_submitted:
+        st.session_state.pop("load_run", None)
+        messages = parse_mix(message_mix_text)
+        customers = parse_mix(customer_mix_text)
+        client = None
+        if in_flight:
+            st.error("Load run not started: the previous run has not drained yet.")
+        elif not messages or not customers:
+            st.error("Message mix and Customer ID mix each need at least one line.")
+        else:
+            try:
+                client = get_load_client(load_region)
+            except Exception as exc:
+                st.error(f"Could not create client: {exc}")
+
+        if client is not None:
+            total = int(total_invocations)
+            workers = int(concurrency)
+            results: list[dict[str, Any]] = []
+            chart_rows = new_chart_rows()
+
+            start = time.perf_counter()
+            pool = ThreadPoolExecutor(max_workers=workers)
+            finished = False
+            try:
+                futures = [
+                    pool.submit(
+                        timed_invocation,
+                        index,
+                        client,
+                        load_runtime_arn,
+                        load_qualifier.strip() or None,
+                        random.choice(messages),
+                        random.choice(customers),
+                        load_actor_id,
+                        cold_start,
+                    )
+                    for index in range(total)
+                ]
+                st.session_state["load_futures"] = futures
+                last_render = start
+                window_start = 0
+                for future in as_completed(futures):
+                    results.append(future.result())
+                    now = time.perf_counter()
+                    if now - last_render >= LOAD_RENDER_INTERVAL_S:
+                        append_chart_point(chart_rows, results[window_start:], now - last_render, now - start)
+                        render_load_stats(stats_placeholder, results, total, now - start, chart_rows)
+                        last_render = now
+                        window_start = len(results)
+                now = time.perf_counter()
+                if len(results) > window_start:
+                    append_chart_point(chart_rows, results[window_start:], now - last_render, now - start)
+                render_load_stats(stats_placeholder, results, total, now - start, chart_rows)
+                finished = True
+            finally:
+                # Stop/rerun raises out of the st.* calls above; drop queued work instead of
+                # waiting for it, and keep the partial results so they can still be exported.
+                pool.shutdown(wait=finished, cancel_futures=not finished)
+                st.session_state["load_run"] = {
+                    "results": list(results),
+                    "total": total,
+                    "elapsed_s": time.perf_counter() - start,
+                    "chart_rows": chart_rows,
+                }
+
+    load_run = st.session_state.get("load_run")
+    if load_run:
+        if not load_submitted:
+            render_load_stats(
+                stats_placeholder,
+                load_run["results"],
+                load_run["total"],
+                load_run["elapsed_s"],
+                load_run["chart_rows"],
+            )
+
+        run_results = load_run["results"]
+        final = latency_percentiles([row["latency_ms"] for row in run_results])
+        run_errors = sum(1 for row in run_results if not row["ok"])
+        run_throughput = len(run_results) / load_run["elapsed_s"] if load_run["elapsed_s"] > 0 else 0.0
+        run_error_rate = run_errors / len(run_results) * 100 if run_results else 0.0
+        st.caption(
+            f"Whole run: p50 {final['p50']} ms · p95 {final['p95']} ms · p99 {final['p99']} ms · "
+            f"{run_throughput:.2f} req/s · {run_error_rate:.1f}% errors"
+        )
+        st.download_button(
+            "Download results (CSV)",
+            data=results_to_csv(load_run["results"]),
+            file_name="load_run_results.csv",
+            mime="text/csv",
+        )
 
-            with st.expander("Raw Agent Response"):
-                st.json(response_data)
+        failures = [row for row in load_run["results"] if not row["ok"]]
+        if failures:
+            with st.expander(f"Errors ({len(failures)})"):
+                st.dataframe(failures)